@@ -11,6 +11,9 @@ from api.routes import create
 
 log = logging.getLogger("uvicorn")
 
+# Serialize numpy arrays/scalars natively, and treat naive datetimes as UTC with a "Z" suffix
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
 
 class ORJSONResponse(JSONResponse):
     """
@@ -22,7 +25,7 @@ class ORJSONResponse(JSONResponse):
     media_type = "application/json"
 
     def render(self, content: typing.Any) -> bytes:
-        return orjson.dumps(content)
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
 
 
 @asynccontextmanager
@@ -1,24 +1,31 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Path, Response
 
-from models.firms_nominatim_models import RequestFirmsCSVDataURL, RequestNominatimSearchURL
+from models.firms_nominatim_models import nominatim_country_codes
 from services.firms_nominatim_service import create_firms_csv_urls, create_nominatim_search_url
 
 router = APIRouter(prefix="/create")
 
+# Country boundaries rarely change, FIRMS URLs are tied to a key that may be revoked
+NOMINATIM_CACHE_CONTROL = "public, max-age=3600"
+FIRMS_CACHE_CONTROL = "private, max-age=600"
 
-@router.post(
-    "/nominatim_search_url",
+
+@router.get(
+    "/nominatim_search_url/{country_code}",
     description="Create Nominatim's search URL based on the queried country code",
-    status_code=201,
 )
-def request_nominatim_search_url(input: RequestNominatimSearchURL):
-    return create_nominatim_search_url(input.country_code)
+async def request_nominatim_search_url(country_code: nominatim_country_codes, response: Response):
+    response.headers["Cache-Control"] = NOMINATIM_CACHE_CONTROL
+    return create_nominatim_search_url(country_code)
 
 
-@router.post(
-    "/firms_csv_urls",
+@router.get(
+    "/firms_csv_urls/{firms_key}",
     description="Create FIRMS CSV Data URL based on inputed country code",
-    status_code=201,
 )
-def request_firms_csv_url(input: RequestFirmsCSVDataURL):
-    return create_firms_csv_urls(input.firms_key)
+async def request_firms_csv_url(
+    response: Response,
+    firms_key: str = Path(pattern=r"^[0-9a-fA-F]{32}$"),
+):
+    response.headers["Cache-Control"] = FIRMS_CACHE_CONTROL
+    return create_firms_csv_urls(firms_key)
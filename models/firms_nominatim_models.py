@@ -1,5 +1,4 @@
 from typing import Literal
-from pydantic import BaseModel
 
 
 nominatim_country_codes = Literal[
@@ -20,11 +19,3 @@ nominatim_country_codes = Literal[
     'TR', 'TT', 'TV', 'TW', 'TZ', 'UA', 'UG', 'UM', 'US', 'UY', 'UZ', 'VA', 'VC', 'VE', 'VG', 'VI',
     'VN', 'VU', 'WF', 'WS', 'XK', 'YE', 'YT', 'ZA', 'ZM', 'ZW'
 ]
-
-
-class RequestFirmsCSVDataURL(BaseModel):
-    firms_key: str
-
-
-class RequestNominatimSearchURL(BaseModel):
-    country_code: nominatim_country_codes = 'BJ'
@@ -1,18 +1,43 @@
+import re
 import requests
 import logging
 import folium
 import geopandas as gpd
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import shapely
 
+from cachetools.func import ttl_cache
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
-from functools import lru_cache
-from io import StringIO
+from requests.adapters import HTTPAdapter
 from streamlit_folium import st_folium
+from typing import Optional
+from urllib.parse import quote
+from urllib3.util.retry import Retry
 
 from models.firms_nominatim_models import nominatim_country_codes
 
 
 FIRMS_API_URL = "https://firms.modaps.eosdis.nasa.gov"
+_FIRMS_KEY_PATTERN = re.compile(r"[0-9a-fA-F]{32}")
+
+NOMINATIM_SEARCH_ENDPOINT = "https://nominatim.openstreetmap.org/search"
+_NOMINATIM_PARAMS = "namedetails=1&polygon_geojson=1&hierarchy=1&addresstype=country"
+
+# Shared session so the FIRMS requests reuse keep-alive connections
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504]),
+    ),
+)
+_TIMEOUT = (5, 60)  # (connect, read) in seconds
 
 
 def get_account_status(map_key: str) -> pd.DataFrame:  # = FIRMS_MAP_KEY
@@ -22,13 +47,14 @@ def get_account_status(map_key: str) -> pd.DataFrame:  # = FIRMS_MAP_KEY
         raise ValueError("FIRMS key is required and cannot be empty.")
 
     # Check if the key is a valid hexadecimal string and has a standard length (e.g., 32 characters)
-    if not all(c in "0123456789abcdef" for c in map_key.lower()) or len(map_key) != 32:
+    if not _FIRMS_KEY_PATTERN.fullmatch(map_key):
         raise ValueError("Invalid FIRMS key. Key should be a 32-character hexadecimal string.")
 
     status_url = f"{FIRMS_API_URL}/mapserver/mapkey_status/?MAP_KEY={map_key}"
 
     try:
-        df = pd.read_json(status_url, typ="series")
+        response = _SESSION.get(status_url, timeout=_TIMEOUT)
+        df = pd.Series(response.json())
     except ValueError:
         # possible error, wrong MAP_KEY value, check for extra quotes, missing letters
         print("There is an issue with the query. \nTry in your browser: %s" % status_url)
@@ -43,14 +69,15 @@ def get_current_transaction_count(map_key: str) -> pd.DataFrame:  # = FIRMS_MAP_
         raise ValueError("FIRMS key is required and cannot be empty.")
 
     # Check if the key is a valid hexadecimal string and has a standard length (e.g., 32 characters)
-    if not all(c in "0123456789abcdef" for c in map_key.lower()) or len(map_key) != 32:
+    if not _FIRMS_KEY_PATTERN.fullmatch(map_key):
         raise ValueError("Invalid FIRMS key. Key should be a 32-character hexadecimal string.")
 
     status_url = f"{FIRMS_API_URL}/mapserver/mapkey_status/?MAP_KEY={map_key}"
     count = 0
 
     try:
-        df = pd.read_json(status_url, typ="series")
+        response = _SESSION.get(status_url, timeout=_TIMEOUT)
+        df = pd.Series(response.json())
         count = df["current_transactions"]
 
     except ValueError:
@@ -68,7 +95,7 @@ def create_firms_csv_urls(
         raise ValueError("FIRMS key is required and cannot be empty.")
 
     # Check if the key is a valid hexadecimal string and has a standard length (e.g., 32 characters)
-    if not all(c in "0123456789abcdef" for c in firms_key.lower()) or len(firms_key) != 32:
+    if not _FIRMS_KEY_PATTERN.fullmatch(firms_key):
         raise ValueError("Invalid FIRMS key. Key should be a 32-character hexadecimal string.")
 
     firms_csv_data_urls = (
@@ -80,6 +107,8 @@ def create_firms_csv_urls(
     return firms_csv_data_urls
 
 
+# Cache each FIRMS CSV for 10 minutes, matching the FIRMS key rate-limit window
+@ttl_cache(maxsize=8, ttl=600)
 def read_firm_csv(
     url: str,
 ) -> pd.DataFrame:
@@ -96,26 +125,56 @@ def read_firm_csv(
                         + "Try again in 10 minutes or use a different key")
 
 
-def fetch_firms_csv_content(url: str) -> StringIO:
+def fetch_firms_csv_content(url: str) -> bytes:
 
     try:
-        response = requests.get(url)
+        response = _SESSION.get(url, timeout=_TIMEOUT)
         response.raise_for_status()
-        return StringIO(response.content.decode("utf-8"))
+        return response.content
 
     except (requests.HTTPError, requests.ConnectionError, OSError) as e:
         logging.error(f"Error fetching CSV content from URL '{url}': {e}")
         raise ValueError(f"Failed to fetch content from '{url}'") from e
 
 
-def process_csv_data(csv_content: StringIO) -> pd.DataFrame:
-
-    data = pd.read_csv(csv_content, dtype={"acq_date": str, "acq_time": str})
+# Explicit column types, "acq_time" would otherwise lose its leading zeros and
+# float32 is plenty for the ~375 m FIRMS pixel coordinates
+_FIRMS_CSV_COLUMN_TYPES = {
+    "latitude": pa.float32(),
+    "longitude": pa.float32(),
+    "acq_date": pa.string(),
+    "acq_time": pa.string(),
+    "satellite": pa.string(),
+}
+
+# Columns kept from both the MODIS and VIIRS CSVs, the rest (brightness, scan, track, daynight)
+# is skipped by the reader
+_FIRMS_CSV_COLUMNS = [
+    "latitude",
+    "longitude",
+    "acq_date",
+    "acq_time",
+    "satellite",
+    "instrument",
+    "confidence",
+    "version",
+    "frp",
+]
+
+
+def process_csv_data(csv_content: bytes) -> pd.DataFrame:
+
+    # Parse with the multi-threaded Arrow CSV reader
+    table = pa_csv.read_csv(
+        pa.BufferReader(csv_content),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=_FIRMS_CSV_COLUMN_TYPES,
+            include_columns=_FIRMS_CSV_COLUMNS,
+        ),
+    )
+    data = table.to_pandas()
 
     try:
-        # Data processing logic...
-        data["high_confidence"] = False  # Initialize the column with False
-
         # Check for required columns
         required_columns = ["confidence", "acq_date", "acq_time", "satellite"]
         missing_columns = [col for col in required_columns if col not in data.columns]
@@ -123,38 +182,13 @@ def process_csv_data(csv_content: StringIO) -> pd.DataFrame:
             raise ValueError(f"Missing required columns in the CSV data: {missing_columns}")
 
         # Mark the rows that meet the confidence criteria
+        hc_mask = pd.Series(False, index=data.index)
         if pd.api.types.is_numeric_dtype(data["confidence"]):
-            data.loc[data["confidence"] >= 70, "high_confidence"] = True
-            data.rename(
-                columns={
-                    "brightness": "brightness_a",
-                    "bright_t31": "brightness_b",
-                },
-                inplace=True,
-            )
+            hc_mask = data["confidence"] >= 70
         elif pd.api.types.is_string_dtype(data["confidence"]):
-            data.loc[data["confidence"].isin(["nominal", "high"]), "high_confidence"] = True
-            data.rename(
-                columns={
-                    "bright_ti4": "brightness_a",
-                    "bright_ti5": "brightness_b",
-                },
-                inplace=True,
-            )
-
-        # Process acquisition datetime
-        data["acq_time"] = data["acq_time"].str.pad(width=4, side="left", fillchar="0")
-        data["acq_datetime"] = pd.to_datetime(
-            data["acq_date"] + " " + data["acq_time"].astype(str).str.zfill(4),
-            format="%Y-%m-%d %H%M%S",
-            errors="coerce"
-        )
+            hc_mask = data["confidence"].isin(["nominal", "high"])
 
-        # Check for datetime conversion errors
-        if data["acq_datetime"].isnull().any():
-            raise ValueError("Error converting acquisition datetime")
-
-        # Calculate "days_ago"
+        # Calculate "days_ago" on all rows, so dates with only low confidence detections still count
         if data["acq_date"].max() == pd.Timestamp(date.today()):
             data["days_ago"] = (
                 data["acq_date"].rank(method="dense", ascending=False).astype(int) - 1
@@ -164,9 +198,26 @@ def process_csv_data(csv_content: StringIO) -> pd.DataFrame:
                 data["acq_date"].rank(method="dense", ascending=False).astype(int)
             )
 
+        # Keep only the high confidence rows before the heavier transformations below
+        data = data.loc[hc_mask].copy()
+        data["high_confidence"] = True
+
+        # Process acquisition datetime (acq_time is HHMM, many pixels share the same timestamp)
+        data["acq_time"] = data["acq_time"].str.zfill(4)
+        data["acq_datetime"] = pd.to_datetime(
+            data["acq_date"].str.cat(data["acq_time"], sep=" "),
+            format="%Y-%m-%d %H%M",
+            cache=True,
+            errors="coerce"
+        )
+
+        # Check for datetime conversion errors
+        if data["acq_datetime"].isnull().any():
+            raise ValueError("Error converting acquisition datetime")
+
         # Type conversions
-        data["satellite"] = data["satellite"].astype(str)
-        data["confidence"] = data["confidence"].astype(str)
+        data["satellite"] = data["satellite"].astype("category")
+        data["confidence"] = data["confidence"].astype(str).astype("category")
 
         return data
 
@@ -175,7 +226,6 @@ def process_csv_data(csv_content: StringIO) -> pd.DataFrame:
         raise ValueError(f"Data processing error: {e}") from e
 
 
-@lru_cache()
 def convert_firms_urls_to_combined_gdf(
     firms_urls: tuple[str, str, str]
 ) -> gpd.GeoDataFrame:
@@ -184,13 +234,9 @@ def convert_firms_urls_to_combined_gdf(
     if not isinstance(firms_urls, tuple) or len(firms_urls) != 3:
         raise ValueError("firms_urls must be a tuple of three strings")
 
-    # Initialize an empty DataFrame
-    single_df = pd.DataFrame()
-    combined_df_list = [single_df]
-
-    for url in firms_urls:
-        df = read_firm_csv(url)  # Assuming read_firm_csv is a defined function
-        combined_df_list.append(df)
+    # Fetch the three CSVs concurrently, the downloads are network bound
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        combined_df_list = list(executor.map(read_firm_csv, firms_urls))
 
     combined_df = pd.concat(combined_df_list, ignore_index=True)
 
@@ -200,22 +246,28 @@ def convert_firms_urls_to_combined_gdf(
     if missing_columns:
         raise ValueError(f"Missing required columns in the data: {missing_columns}")
 
-    # Assuming there's a column named 'high_confidence' in the DataFrame
-    combined_df = combined_df[combined_df["high_confidence"]].copy()
+    # Rows are already filtered to high confidence in process_csv_data
 
-    # Drop duplicates
+    # Categories differ between the CSVs, so concat falls back to object dtype
+    combined_df = combined_df.astype({"satellite": "category", "confidence": "category"})
+
+    # Sort (stable, so duplicates keep their original order) then drop duplicates in one pass
     unique_columns = ["latitude", "longitude", "acq_datetime", "confidence", "version"]
-    combined_df_export = combined_df.drop_duplicates(subset=unique_columns, keep="last").copy()
+    combined_df.sort_values(["acq_datetime"], kind="stable", inplace=True)
+    combined_df_export = combined_df.groupby(
+        unique_columns, sort=False, observed=True, dropna=False
+    ).tail(1)
 
-    # Sort and drop unnecessary columns
-    combined_df_export.sort_values(["acq_datetime"], inplace=True)
-    drop_columns = ['scan', 'track', 'acq_date', 'acq_time', 'brightness_a', 'brightness_b', 'daynight']
-    combined_df_export.drop(drop_columns, axis=1, inplace=True)
+    # Drop the raw date/time columns, the other unused columns are skipped when reading the CSVs
+    combined_df_export = combined_df_export.drop(columns=["acq_date", "acq_time"])
 
     # Convert to GeoDataFrame
     gdf = gpd.GeoDataFrame(
         combined_df_export,
-        geometry=gpd.points_from_xy(combined_df_export.longitude, combined_df_export.latitude),
+        geometry=shapely.points(
+            combined_df_export["longitude"].to_numpy(),
+            combined_df_export["latitude"].to_numpy(),
+        ),
         crs="EPSG:4326",
     )
 
@@ -240,18 +292,9 @@ def create_nominatim_search_url(
     -------
     """
 
-    NOMINATIM_SEARCH_ENDPOINT = "https://nominatim.openstreetmap.org/search"
-
-    params = {
-        "namedetails": 1,
-        "polygon_geojson": 1,
-        "hierarchy": 1,
-        "addresstype": "country",
-    }
-
-    params_query = "&".join(f"{param_name}={param_value}" for param_name, param_value in params.items())
     nominatim_search_url = (
-        f"{NOMINATIM_SEARCH_ENDPOINT}?q={country_code}&featureType=country&{params_query}&format=geojson"
+        f"{NOMINATIM_SEARCH_ENDPOINT}?q={quote(country_code)}&featureType=country"
+        f"&{_NOMINATIM_PARAMS}&format=geojson"
     )
     return nominatim_search_url
 
@@ -295,11 +338,14 @@ def process_nominatim_search_content(
         raise ValueError("Invalid format") from e
 
     try:
-        gdf = gdf.to_crs(epsg=4326)
+        # Nominatim GeoJSON is already in EPSG:4326, only reproject if that ever changes
+        if gdf.crs is None or gdf.crs.to_epsg() != 4326:
+            gdf = gdf.to_crs(epsg=4326)
 
-        # Calculate the centroid of the GeoDataFrame
-        gdf_centroid = gdf.to_crs("+proj=cea").centroid.to_crs(gdf.crs)
-        gdf_centroid = list(gdf_centroid.total_bounds)
+        # Calculate the centroid of the GeoDataFrame directly on the lon/lat coordinates,
+        # which is close enough for centering the map and avoids reprojecting every vertex
+        gdf_centroid = shapely.centroid(gdf.geometry.to_numpy())
+        gdf_centroid = list(shapely.total_bounds(gdf_centroid))
 
         # Calculate the center of the GeoDataFrame
         center_x = (gdf_centroid[0] + gdf_centroid[2]) / 2  # Average of minx and maxx
@@ -312,9 +358,27 @@ def process_nominatim_search_content(
         raise ValueError(f"Error processing GeoDataFrame: {e}")
 
 
+def dissolve_country_area(
+    country_gdf: gpd.GeoDataFrame
+) -> shapely.Geometry:
+
+    """
+    Dissolves the polygons of a GeoDataFrame into a single prepared (multi)polygon.
+
+    :param country_gdf: GeoDataFrame containing multipolygons.
+    :return: Prepared geometry covering all polygons, in the CRS of country_gdf.
+    """
+
+    country_area = country_gdf.geometry.unary_union
+    shapely.prepare(country_area)
+
+    return country_area
+
+
 def filter_firms_points_within_country_area(
     firms_world_gdf: gpd.GeoDataFrame,
-    country_gdf: gpd.GeoDataFrame
+    country_gdf: gpd.GeoDataFrame,
+    country_area: Optional[shapely.Geometry] = None
 ) -> gpd.GeoDataFrame:
 
     """
@@ -323,6 +387,7 @@ def filter_firms_points_within_country_area(
 
     :param firms_world_gdf: GeoDataFrame containing points.
     :param country_gdf: GeoDataFrame containing multipolygons.
+    :param country_area: Optional result of dissolve_country_area(country_gdf), to reuse across calls.
     :return: GeoDataFrame containing only the points that are inside the specified area(s).
     """
 
@@ -347,10 +412,15 @@ def filter_firms_points_within_country_area(
     except Exception as e:
         raise ValueError("Error in transforming CRS of the GeoDataFrame: " + str(e))
 
-    # Filter points that are within the polygons
+    # Filter points that are within the dissolved polygons (prepared geometry, vectorized test)
     try:
-        within_area = firms_world_gdf.geometry.apply(
-            lambda point: any(point.within(polygon) for polygon in country_gdf.geometry)
+        if country_area is None:
+            country_area = dissolve_country_area(country_gdf)
+
+        within_area = shapely.contains_xy(
+            country_area,
+            firms_world_gdf.geometry.x.to_numpy(),
+            firms_world_gdf.geometry.y.to_numpy(),
         )
     except Exception as e:
         raise ValueError("Error in filtering points within country area: " + str(e))
@@ -396,7 +466,7 @@ def display_firms_points_within_country_boundary(
     try:
         foliumMap = folium.Map(location=country_centroid, zoom_start=5, tiles="CartoDB positron")
 
-        colors = [
+        colors = np.array([
             "darkred",
             "red",
             "darkorange",
@@ -407,24 +477,33 @@ def display_firms_points_within_country_boundary(
             "lightgray",
             "lightgray",
             "gray",
-        ]
+        ])
+
+        # Look up the marker color of every point at once, based on days_ago
+        filtered_firms_gdf = filtered_firms_gdf.assign(
+            color=colors[filtered_firms_gdf["days_ago"].clip(0, len(colors) - 1).astype(int).to_numpy()]
+        )
+
+        # Keep only the columns the map uses, which shrinks the payload sent to the browser,
+        # and pass GeoJSON strings so folium skips its own to_crs on the GeoDataFrames
+        firms_geojson = filtered_firms_gdf[
+            ["acq_datetime", "confidence", "days_ago", "color", "geometry"]
+        ].to_json()
+        country_geojson = country_gdf[["display_name", "geometry"]].to_json()
 
         # Add a marker for each point in the data, with a color based on datetime_rank
         folium.GeoJson(
-            filtered_firms_gdf,
+            data=firms_geojson,
             marker=folium.Marker(icon=folium.Icon(icon="fire", color="gray")),
             tooltip=folium.GeoJsonTooltip(
                 fields=["acq_datetime", "confidence", "days_ago"],
                 aliases=["Fire Detected On: ", "Detection Confidence: ", "Days Ago: "],
             ),
-            style_function=lambda x: {
-                "markerColor": colors[x["properties"]["days_ago"]]
-                if x["properties"]["days_ago"] is not None else "gray"
-            },
+            style_function=lambda x: {"markerColor": x["properties"]["color"]},
         ).add_to(foliumMap)
 
         folium.GeoJson(
-            data=country_gdf,
+            data=country_geojson,
             name="Country",  # Optional: give a name to the layer
             tooltip=folium.GeoJsonTooltip(
                 fields=["display_name"],  # Field(s) to be shown in the tooltip
@@ -1,12 +1,13 @@
-import json
-import requests
 import streamlit as st
 
 from services.firms_nominatim_service import (
     get_account_status,
     get_current_transaction_count,
+    create_firms_csv_urls,
+    create_nominatim_search_url,
     convert_firms_urls_to_combined_gdf,
     convert_nominatim_url_to_gdf,
+    dissolve_country_area,
     filter_firms_points_within_country_area,
     display_firms_points_within_country_boundary
 )
@@ -32,6 +33,30 @@ def grabbing_firms_world_data(response_firms_urls: tuple, inputed_key: str):
     return firms_world_gdf
 
 
+# Function to get the country boundary and keep it in cache, boundaries rarely change
+@st.cache_data(ttl=86400, show_spinner=False)
+def grabbing_country_data(country_code: str):
+    """
+    Function to get the country boundary GeoDataFrame and its center coordinates
+    """
+
+    nominatim_search_url = create_nominatim_search_url(country_code)
+
+    return convert_nominatim_url_to_gdf(nominatim_search_url)
+
+
+# Function to get the dissolved and prepared country area, reused across reruns
+@st.cache_resource(ttl=86400, show_spinner=False)
+def grabbing_country_area(country_code: str):
+    """
+    Function to get the dissolved and prepared country area of the country boundary
+    """
+
+    country_gdf, _ = grabbing_country_data(country_code)
+
+    return dissolve_country_area(country_gdf)
+
+
 def set_state(i, country_code=None):
     st.session_state.stage = i
 
@@ -59,14 +84,9 @@ def firms_points_in_queried_aoi_map():
 
         # st.write(f'Entered FIRMS map key: "{inputed_key}"')
 
-        # FIRMS API input
-        inputs_firms = {"firms_key": inputed_key}
-        response_firms_urls = requests.post(
-            "http://localhost:8000/create/firms_csv_urls",
-            data=json.dumps(inputs_firms),
-        ).json()
+        # FIRMS API input (called directly, the API endpoint is kept for external clients)
+        response_firms_urls = create_firms_csv_urls(inputed_key)
         # st.text(f"The URLs to query FIRMS Data of the last 9 days: \n{response_firms_urls}")
-        response_firms_urls = tuple(response_firms_urls)
 
         # Check if inputed_key has changed
         if "last_inputed_key" not in st.session_state or (
@@ -111,17 +131,13 @@ def firms_points_in_queried_aoi_map():
             # st.write(f"Selected country code: {entered_country_code}")
 
             # Nominatim Search API input
-            inputs_nominatim = {"country_code": entered_country_code}
-
-            response_nominatim_url = requests.post(
-                "http://localhost:8000/create/nominatim_search_url",
-                data=json.dumps(inputs_nominatim),
-            ).json()
-
-            country_gdf, country_center = convert_nominatim_url_to_gdf(response_nominatim_url)
+            country_gdf, country_center = grabbing_country_data(entered_country_code)
             # print("\n", country_gdf, "\n")
 
-            filtered_firms_gdf = filter_firms_points_within_country_area(firms_world_gdf, country_gdf)
+            country_area = grabbing_country_area(entered_country_code)
+            filtered_firms_gdf = filter_firms_points_within_country_area(
+                firms_world_gdf, country_gdf, country_area
+            )
             # print("\n", filtered_firms_gdf, "\n")
 
             if not filtered_firms_gdf.empty: